@@ -9,26 +9,94 @@ The app processes complaint data with categories, subcategories, person_id, hous
 row_id, island, and atoll information to provide detailed statistical analysis.
 """
 
-from flask import Flask, render_template, request, send_file, flash, redirect, url_for, jsonify
+from flask import Flask, Response, render_template, request, flash, redirect, url_for, jsonify
+from jinja2 import Template
 import pandas as pd
 import numpy as np
 from io import BytesIO
 import os
-from werkzeug.utils import secure_filename
-import tempfile
 from datetime import datetime
 import base64
+from collections import OrderedDict
+import hashlib
+import threading
+
+try:
+    import xxhash
+except ImportError:  # fall back to hashlib.blake2b for upload digests
+    xxhash = None
 
 # Initialize Flask application
 app = Flask(__name__)
 app.secret_key = os.environ.get('SECRET_KEY', 'your-secret-key-change-this')
 
 # Configuration for file uploads
-UPLOAD_FOLDER = '/tmp/uploads'  # Use /tmp for Vercel
 ALLOWED_EXTENSIONS = {'xlsx', 'xls'}
 
-# Ensure upload directory exists
-os.makedirs(UPLOAD_FOLDER, exist_ok=True)
+# Label columns converted to pandas categoricals before analysis
+CATEGORICAL_COLUMNS = ['category_en', 'subcategory_en', 'island', 'atoll', 'category', 'subcategory']
+
+# Columns read from each input workbook
+REQUIRED_COLUMNS = ['category', 'subcategory', 'person_id', 'household_id', 'row_id', 'island', 'atoll']
+TRANSLATION_COLUMNS = ['category', 'subcategory', 'category_en', 'subcategory_en']
+POPULATION_COLUMNS = ['atoll', 'island', 'total_population', 'total_households']
+
+# Prefer the Rust-based calamine reader (pandas >= 2.2) when it is installed
+try:
+    import python_calamine  # noqa: F401
+    FAST_EXCEL_ENGINE = 'calamine'
+except ImportError:
+    FAST_EXCEL_ENGINE = None
+
+# pd.read_excel options per file type: only load the columns we use, with explicit dtypes
+READ_KW = {
+    'complaint': {
+        'usecols': lambda col: col in REQUIRED_COLUMNS,
+        'dtype': {col: 'string' for col in REQUIRED_COLUMNS}
+    },
+    'translation': {
+        'usecols': lambda col: col in TRANSLATION_COLUMNS,
+        'dtype': {col: 'string' for col in TRANSLATION_COLUMNS}
+    },
+    'population': {
+        'usecols': lambda col: col in POPULATION_COLUMNS,
+        'dtype': {'atoll': 'string', 'island': 'string'}
+    }
+}
+
+# Static head of the HTML report; the generation timestamp is appended per report
+REPORT_HEADER = """
+    <!DOCTYPE html>
+    <html>
+    <head>
+        <title>Citizen Complaint Analysis Report</title>
+        <style>
+            body { font-family: Arial, sans-serif; margin: 20px; }
+            h1, h2, h3 { color: #2c3e50; }
+            table { border-collapse: collapse; width: 100%; margin: 20px 0; }
+            th, td { border: 1px solid #ddd; padding: 8px; text-align: left; }
+            th { background-color: #3498db; color: white; }
+            .location-section { margin: 30px 0; }
+            .analysis-section { margin: 20px 0; }
+        </style>
+    </head>
+    <body>
+        <h1>Citizen Complaint Analysis Report</h1>
+"""
+
+# Compiled once at import: one analysis table, rows are (subcategory, count, percentage...)
+TABLE_TEMPLATE = Template(
+    "<div class='analysis-section'><h4>{{ title }}</h4>"
+    "<table><tr>{% for header in headers %}<th>{{ header }}</th>{% endfor %}</tr>"
+    "{% for row in rows %}<tr><td>{{ row[0] }}</td><td>{{ row[1] }}</td>"
+    "{% for pct in row[2:] %}<td>{{ pct }}%</td>{% endfor %}</tr>{% endfor %}"
+    "</table></div>"
+)
+
+# Analysis results of recently uploaded workbooks, keyed by content digest and extension
+RESULT_CACHE_SIZE = 8
+result_cache = OrderedDict()
+result_cache_lock = threading.Lock()
 
 def allowed_file(filename):
     """
@@ -43,50 +111,93 @@ def allowed_file(filename):
     return '.' in filename and \
            filename.rsplit('.', 1)[1].lower() in ALLOWED_EXTENSIONS
 
-def process_complaint_data(file_path, translation_file_path=None, population_file_path=None):
+def read_excel_file(source, file_type, filename=None):
+    """
+    Read an Excel file using the column and dtype options for its file type
+    
+    Args:
+        source (str or file-like): Path to the Excel file, or a seekable binary stream
+        file_type (str): Key into READ_KW ('complaint', 'translation' or 'population')
+        filename (str): Original file name, used to pick the engine for streams (optional)
+        
+    Returns:
+        DataFrame: Contents of the first sheet, restricted to the columns we use
+    """
+    name = filename or (source if isinstance(source, str) else '')
+    
+    # calamine reads both .xlsx and .xls; otherwise openpyxl (opened read-only by
+    # pandas) handles .xlsx and legacy .xls needs xlrd
+    if FAST_EXCEL_ENGINE is not None:
+        engine = FAST_EXCEL_ENGINE
+    else:
+        engine = 'xlrd' if name.lower().endswith('.xls') else 'openpyxl'
+    return pd.read_excel(source, engine=engine, nrows=None, **READ_KW[file_type])
+
+def process_complaint_data(file_path, translation_file_path=None, population_file_path=None, filename=None):
     """
     Process the uploaded Excel file containing complaint data
     
     Args:
-        file_path (str): Path to the uploaded complaint data file
+        file_path (str or file-like): Path to, or binary stream of, the complaint data file
         translation_file_path (str): Path to translation file (optional)
         population_file_path (str): Path to population data file (optional)
+        filename (str): Original name of the complaint data file (optional)
         
     Returns:
         dict: Dictionary containing processed data and analysis results
     """
     try:
         # Read the main complaint data
-        df = pd.read_excel(file_path)
+        df = read_excel_file(file_path, 'complaint', filename)
         
         # Validate required columns exist
-        required_columns = ['category', 'subcategory', 'person_id', 'household_id', 'row_id', 'island', 'atoll']
-        missing_columns = [col for col in required_columns if col not in df.columns]
+        missing_columns = [col for col in REQUIRED_COLUMNS if col not in df.columns]
         
         if missing_columns:
             raise ValueError(f"Missing required columns: {missing_columns}")
         
+        # Keep only the columns the analysis uses, whichever reader produced the frame
+        df = df.loc[:, REQUIRED_COLUMNS]
+        
         # Read translation data if provided
         translation_df = None
         if translation_file_path and os.path.exists(translation_file_path):
-            translation_df = pd.read_excel(translation_file_path)
+            translation_df = read_excel_file(translation_file_path, 'translation')
+            translation_df = translation_df.loc[:, [col for col in TRANSLATION_COLUMNS if col in translation_df.columns]]
         
         # Read population data if provided
         population_df = None
         if population_file_path and os.path.exists(population_file_path):
-            population_df = pd.read_excel(population_file_path)
+            population_df = read_excel_file(population_file_path, 'population')
+            population_df = population_df.loc[:, [col for col in POPULATION_COLUMNS if col in population_df.columns]]
         
         # Apply translations if available
         if translation_df is not None:
+            # Join on categorical keys that share the complaint data's categories
+            for col in ['category', 'subcategory']:
+                df[col] = df[col].astype('category')
+                translation_df[col] = pd.Categorical(translation_df[col], categories=df[col].cat.categories)
+            translation_df = translation_df.dropna(subset=['category', 'subcategory'])
+            translation_df = translation_df.drop_duplicates(subset=['category', 'subcategory'])
+            
             # Merge with translation data to get English labels
             df = df.merge(translation_df, on=['category', 'subcategory'], how='left')
-            # Use English labels if available, otherwise keep original
-            df['subcategory_en'] = df.get('subcategory_en', df['subcategory'])
-            df['category_en'] = df.get('category_en', df['category'])
+            # Use English labels where available, otherwise keep the original row by row
+            missing = pd.Series(index=df.index, dtype='string')
+            df['subcategory_en'] = df.get('subcategory_en', missing).fillna(df['subcategory'].astype('string'))
+            df['category_en'] = df.get('category_en', missing).fillna(df['category'].astype('string'))
         else:
             df['subcategory_en'] = df['subcategory']
             df['category_en'] = df['category']
         
+        # Store label columns as categoricals so grouping works on integer codes
+        for col in CATEGORICAL_COLUMNS:
+            df[col] = df[col].astype('category')
+        
+        # Encode identifiers once so the atoll and island analyses share the same codes
+        for col in ['person_id', 'household_id']:
+            df[col] = df[col].astype('category')
+        
         # Perform analysis
         results = perform_analysis(df, population_df)
         
@@ -104,6 +215,53 @@ def process_complaint_data(file_path, translation_file_path=None, population_fil
             'error': str(e)
         }
 
+def file_digest(data):
+    """
+    Compute a content digest for an uploaded file
+    
+    Args:
+        data (bytes): Raw file contents
+        
+    Returns:
+        str: Hex digest (xxh3-128 when xxhash is installed, otherwise blake2b-128)
+    """
+    if xxhash is not None:
+        return xxhash.xxh3_128_hexdigest(data)
+    return hashlib.blake2b(data, digest_size=16).hexdigest()
+
+def process_complaint_data_cached(data, filename=None):
+    """
+    Process uploaded complaint data, reusing the result for repeated uploads
+    
+    Successful results are kept in a small LRU cache keyed by the file's digest and
+    extension (which selects the Excel engine), so re-submitting the same workbook
+    skips parsing and analysis.
+    
+    Args:
+        data (bytes): Raw contents of the complaint data file
+        filename (str): Original name of the complaint data file (optional)
+        
+    Returns:
+        dict: Same structure as process_complaint_data
+    """
+    extension = os.path.splitext(filename or '')[1].lower()
+    key = (file_digest(data), extension)
+    with result_cache_lock:
+        if key in result_cache:
+            result_cache.move_to_end(key)
+            return result_cache[key]
+    
+    result = process_complaint_data(BytesIO(data), filename=filename)
+    
+    if result['success']:
+        with result_cache_lock:
+            result_cache[key] = result
+            result_cache.move_to_end(key)
+            while len(result_cache) > RESULT_CACHE_SIZE:
+                result_cache.popitem(last=False)
+    
+    return result
+
 def perform_analysis(df, population_df=None):
     """
     Perform comprehensive analysis of complaint data
@@ -117,80 +275,112 @@ def perform_analysis(df, population_df=None):
     """
     results = {}
     
+    # Build population lookups once per location type
+    atoll_population = build_population_lookup(population_df, 'atoll')
+    island_population = build_population_lookup(population_df, 'island')
+    
     # Analysis by Atoll
-    results['by_atoll'] = analyze_by_location(df, 'atoll', population_df)
+    results['by_atoll'] = analyze_by_location(df, 'atoll', atoll_population)
     
     # Analysis by Island
-    results['by_island'] = analyze_by_location(df, 'island', population_df)
+    results['by_island'] = analyze_by_location(df, 'island', island_population)
     
     return results
 
-def analyze_by_location(df, location_col, population_df=None):
+def build_population_lookup(population_df, location_col):
+    """
+    Index population data by location for constant-time lookups
+    
+    Args:
+        population_df (DataFrame): Population data (optional)
+        location_col (str): Column name for location ('atoll' or 'island')
+        
+    Returns:
+        dict: Maps each location to its total_population and total_households
+    """
+    if population_df is None or location_col not in population_df.columns:
+        return {}
+    
+    # Keep the first row per location, matching the previous row-filter behaviour
+    population = population_df.drop_duplicates(subset=location_col).set_index(location_col)
+    population = population.reindex(columns=['total_population', 'total_households'], fill_value=0)
+    return population.to_dict('index')
+
+def aggregate_by_location(df, location_col):
+    """
+    Count complaints, unique individuals and unique households per location
+    and per (location, subcategory) pair
+    
+    Args:
+        df (DataFrame): Complaint data
+        location_col (str): Column name for location ('atoll' or 'island')
+        
+    Returns:
+        tuple: (grouped, totals) where grouped is indexed by (location, subcategory)
+               with 'count', 'ind' and 'hh' columns, and totals is indexed by location
+               with 'tot', 'tind' and 'thh' columns
+    """
+    # Per (location, subcategory) pair; only observed pairs, in order of first appearance
+    grouped = df.groupby([location_col, 'subcategory_en'], sort=False, observed=True).agg(
+        count=('row_id', 'size'),
+        ind=('person_id', 'nunique'),
+        hh=('household_id', 'nunique')
+    )
+    
+    # Per-location totals, over every row with a location; observed locations only,
+    # in order of first appearance rather than sorted by label
+    totals = df.groupby(location_col, sort=False, observed=True).agg(
+        tot=('row_id', 'size'),
+        tind=('person_id', 'nunique'),
+        thh=('household_id', 'nunique')
+    )
+    
+    return grouped, totals
+
+def analyze_by_location(df, location_col, population_lookup=None):
     """
     Analyze complaints by location (atoll or island)
     
     Args:
         df (DataFrame): Complaint data
         location_col (str): Column name for location ('atoll' or 'island')
-        population_df (DataFrame): Population data (optional)
+        population_lookup (dict): Population data by location from build_population_lookup (optional)
         
     Returns:
         dict: Analysis results for the specified location type
     """
     location_results = {}
     
-    # Get unique locations
-    locations = df[location_col].unique()
+    # Aggregate every (location, subcategory) pair and every location in a single pass
+    grouped, totals = aggregate_by_location(df, location_col)
     
-    for location in locations:
-        location_data = df[df[location_col] == location]
-        
-        # Analysis 1: Count by subcategory (total complaints)
-        subcategory_counts = location_data['subcategory_en'].value_counts()
-        subcategory_percentages = (subcategory_counts / len(location_data) * 100).round(2)
-        
-        # Analysis 2: Count by unique individuals
-        individual_counts = location_data.groupby('subcategory_en')['person_id'].nunique().sort_values(ascending=False)
-        total_individuals = location_data['person_id'].nunique()
-        individual_percentages = (individual_counts / total_individuals * 100).round(2)
-        
-        # Analysis 3: Count by unique households
-        household_counts = location_data.groupby('subcategory_en')['household_id'].nunique().sort_values(ascending=False)
-        total_households = location_data['household_id'].nunique()
-        household_percentages = (household_counts / total_households * 100).round(2)
+    # A location whose rows all lack a subcategory has totals but no subcategory rows
+    grouped_locations = set(grouped.index.get_level_values(0))
+    no_subcategories = grouped.iloc[:0].droplevel(0)
+    
+    for location in totals.index:
+        location_agg = grouped.xs(location) if location in grouped_locations else no_subcategories
+        total_complaints = int(totals.at[location, 'tot'])
+        total_individuals = int(totals.at[location, 'tind'])
+        total_households = int(totals.at[location, 'thh'])
         
         # Get population data if available
-        population_info = {}
-        if population_df is not None:
-            pop_data = population_df[population_df[location_col] == location]
-            if not pop_data.empty:
-                population_info = {
-                    'total_population': pop_data.iloc[0].get('total_population', 0),
-                    'total_households': pop_data.iloc[0].get('total_households', 0)
-                }
-        
-        # Calculate population percentages if population data is available
-        individual_pop_percentages = {}
-        household_pop_percentages = {}
-        
-        if population_info.get('total_population', 0) > 0:
-            individual_pop_percentages = (individual_counts / population_info['total_population'] * 100).round(2)
-        
-        if population_info.get('total_households', 0) > 0:
-            household_pop_percentages = (household_counts / population_info['total_households'] * 100).round(2)
+        population_info = (population_lookup or {}).get(location, {})
         
         location_results[location] = {
-            'subcategory_counts': subcategory_counts.head(20),
-            'subcategory_percentages': subcategory_percentages.head(20),
-            'individual_counts': individual_counts.head(20),
-            'individual_percentages': individual_percentages.head(20),
-            'individual_pop_percentages': individual_pop_percentages.head(20),
-            'household_counts': household_counts.head(20),
-            'household_percentages': household_percentages.head(20),
-            'household_pop_percentages': household_pop_percentages.head(20),
+            # Analysis 1: Count by subcategory (total complaints)
+            'subcategory_table': build_top_table(location_agg['count'], total_complaints),
+            # Analysis 2: Count by unique individuals
+            'individual_table': build_top_table(
+                location_agg['ind'], total_individuals, population_info.get('total_population', 0)
+            ),
+            # Analysis 3: Count by unique households
+            'household_table': build_top_table(
+                location_agg['hh'], total_households, population_info.get('total_households', 0)
+            ),
             'population_info': population_info,
             'summary': {
-                'total_complaints': len(location_data),
+                'total_complaints': total_complaints,
                 'total_individuals': total_individuals,
                 'total_households': total_households
             }
@@ -198,6 +388,36 @@ def analyze_by_location(df, location_col, population_df=None):
     
     return location_results
 
+def build_top_table(counts, total, population_total=None):
+    """
+    Build the top 20 rows of one analysis table as aligned numpy arrays
+    
+    Args:
+        counts (Series): Counts indexed by subcategory
+        total (int): Surveyed total used for the percentage column
+        population_total (int): Population total for the population percentage column (optional)
+        
+    Returns:
+        dict: 'subcategory', 'count' and 'pct' arrays in the same row order, plus
+              'pop_pct' when population_total is given (zeros if it is not positive)
+    """
+    top = counts.nlargest(20)
+    values = top.to_numpy()
+    
+    table = {
+        'subcategory': top.index.to_numpy(),
+        'count': values,
+        'pct': (values / total * 100).round(2)
+    }
+    
+    if population_total is not None:
+        if population_total > 0:
+            table['pop_pct'] = (values / population_total * 100).round(2)
+        else:
+            table['pop_pct'] = np.zeros(len(values), dtype=int)
+    
+    return table
+
 def generate_report(results):
     """
     Generate a formatted report from analysis results
@@ -205,82 +425,83 @@ def generate_report(results):
     Args:
         results (dict): Analysis results from perform_analysis
         
-    Returns:
-        str: HTML formatted report
+    Yields:
+        str: Consecutive chunks of the HTML formatted report
     """
-    html_content = """
-    <!DOCTYPE html>
-    <html>
-    <head>
-        <title>Citizen Complaint Analysis Report</title>
-        <style>
-            body { font-family: Arial, sans-serif; margin: 20px; }
-            h1, h2, h3 { color: #2c3e50; }
-            table { border-collapse: collapse; width: 100%; margin: 20px 0; }
-            th, td { border: 1px solid #ddd; padding: 8px; text-align: left; }
-            th { background-color: #3498db; color: white; }
-            .location-section { margin: 30px 0; }
-            .analysis-section { margin: 20px 0; }
-        </style>
-    </head>
-    <body>
-        <h1>Citizen Complaint Analysis Report</h1>
-        <p>Generated on: {}</p>
-    """.format(datetime.now().strftime("%Y-%m-%d %H:%M:%S"))
+    # Collect fragments in a list and emit them joined, one chunk per location
+    parts = []
+    append = parts.append
+    
+    append(REPORT_HEADER)
+    append(f"<p>Generated on: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}</p>")
     
     # Add summary statistics
-    html_content += "<h2>Summary Statistics</h2>"
-    html_content += "<p>Total Complaints: {}</p>".format(results.get('total_complaints', 0))
-    html_content += "<p>Total Individuals: {}</p>".format(results.get('total_individuals', 0))
-    html_content += "<p>Total Households: {}</p>".format(results.get('total_households', 0))
+    append("<h2>Summary Statistics</h2>")
+    append(f"<p>Total Complaints: {results.get('total_complaints', 0)}</p>")
+    append(f"<p>Total Individuals: {results.get('total_individuals', 0)}</p>")
+    append(f"<p>Total Households: {results.get('total_households', 0)}</p>")
+    yield ''.join(parts)
+    parts.clear()
     
     # Process each location type (atoll and island)
     for location_type, location_data in results['data'].items():
-        html_content += f"<div class='location-section'>"
-        html_content += f"<h2>Analysis by {location_type.replace('_', ' ').title()}</h2>"
+        append("<div class='location-section'>")
+        append(f"<h2>Analysis by {location_type.replace('_', ' ').title()}</h2>")
         
         for location, analysis in location_data.items():
-            html_content += f"<h3>{location}</h3>"
+            append(f"<h3>{location}</h3>")
             
             # Analysis 1: Subcategory counts
-            html_content += "<div class='analysis-section'>"
-            html_content += "<h4>Top 20 Complaint Subcategories (by total complaints)</h4>"
-            html_content += "<table><tr><th>Subcategory</th><th>Count</th><th>Percentage of Total Complaints</th></tr>"
-            
-            for subcategory, count in analysis['subcategory_counts'].items():
-                percentage = analysis['subcategory_percentages'].get(subcategory, 0)
-                html_content += f"<tr><td>{subcategory}</td><td>{count}</td><td>{percentage}%</td></tr>"
-            
-            html_content += "</table></div>"
+            table = analysis['subcategory_table']
+            append(TABLE_TEMPLATE.render(
+                title='Top 20 Complaint Subcategories (by total complaints)',
+                headers=['Subcategory', 'Count', 'Percentage of Total Complaints'],
+                rows=zip(table['subcategory'], table['count'], table['pct'])
+            ))
             
             # Analysis 2: Individual counts
-            html_content += "<div class='analysis-section'>"
-            html_content += "<h4>Top 20 Complaint Subcategories (by unique individuals)</h4>"
-            html_content += "<table><tr><th>Subcategory</th><th>Unique Individuals</th><th>% of Surveyed Individuals</th><th>% of Total Population</th></tr>"
-            
-            for subcategory, count in analysis['individual_counts'].items():
-                individual_pct = analysis['individual_percentages'].get(subcategory, 0)
-                pop_pct = analysis['individual_pop_percentages'].get(subcategory, 0)
-                html_content += f"<tr><td>{subcategory}</td><td>{count}</td><td>{individual_pct}%</td><td>{pop_pct}%</td></tr>"
-            
-            html_content += "</table></div>"
+            table = analysis['individual_table']
+            append(TABLE_TEMPLATE.render(
+                title='Top 20 Complaint Subcategories (by unique individuals)',
+                headers=['Subcategory', 'Unique Individuals', '% of Surveyed Individuals', '% of Total Population'],
+                rows=zip(table['subcategory'], table['count'], table['pct'], table['pop_pct'])
+            ))
             
             # Analysis 3: Household counts
-            html_content += "<div class='analysis-section'>"
-            html_content += "<h4>Top 20 Complaint Subcategories (by unique households)</h4>"
-            html_content += "<table><tr><th>Subcategory</th><th>Unique Households</th><th>% of Surveyed Households</th><th>% of Total Households</th></tr>"
-            
-            for subcategory, count in analysis['household_counts'].items():
-                household_pct = analysis['household_percentages'].get(subcategory, 0)
-                pop_pct = analysis['household_pop_percentages'].get(subcategory, 0)
-                html_content += f"<tr><td>{subcategory}</td><td>{count}</td><td>{household_pct}%</td><td>{pop_pct}%</td></tr>"
-            
-            html_content += "</table></div>"
+            table = analysis['household_table']
+            append(TABLE_TEMPLATE.render(
+                title='Top 20 Complaint Subcategories (by unique households)',
+                headers=['Subcategory', 'Unique Households', '% of Surveyed Households', '% of Total Households'],
+                rows=zip(table['subcategory'], table['count'], table['pct'], table['pop_pct'])
+            ))
+            yield ''.join(parts)
+            parts.clear()
         
-        html_content += "</div>"
+        append("</div>")
+    
+    append("</body></html>")
+    yield ''.join(parts)
+
+def encode_base64_chunks(chunks):
+    """
+    Base64-encode streamed text without joining it into one string first
     
-    html_content += "</body></html>"
-    return html_content
+    Args:
+        chunks (iterable): Text chunks, e.g. from generate_report
+        
+    Returns:
+        str: Base64 encoding of the UTF-8 bytes of all chunks concatenated
+    """
+    encoded = []
+    pending = b''
+    for chunk in chunks:
+        data = pending + chunk.encode('utf-8')
+        # Encode whole 3-byte groups only, so the pieces concatenate without padding
+        cut = len(data) - len(data) % 3
+        encoded.append(base64.b64encode(data[:cut]).decode('ascii'))
+        pending = data[cut:]
+    encoded.append(base64.b64encode(pending).decode('ascii'))
+    return ''.join(encoded)
 
 @app.route('/')
 def index():
@@ -304,34 +525,25 @@ def upload_file():
         return redirect(request.url)
     
     if file and allowed_file(file.filename):
-        filename = secure_filename(file.filename)
-        file_path = os.path.join(UPLOAD_FOLDER, filename)
-        file.save(file_path)
-        
-        # Process the file
-        result = process_complaint_data(file_path)
+        # Process the file, reusing the analysis if this workbook was seen recently
+        result = process_complaint_data_cached(file.stream.read(), filename=file.filename)
         
         if result['success']:
-            # Generate report
-            report_html = generate_report(result)
-            
             # For Vercel, return the HTML content directly
             if request.is_json:
                 # Return as base64 encoded string for API calls
-                html_bytes = report_html.encode('utf-8')
-                html_base64 = base64.b64encode(html_bytes).decode('utf-8')
+                html_base64 = encode_base64_chunks(generate_report(result))
                 return jsonify({
                     'success': True,
                     'report_html': html_base64,
                     'filename': 'complaint_analysis_report.html'
                 })
             else:
-                # Return as file download for web form
-                return send_file(
-                    BytesIO(report_html.encode('utf-8')),
-                    as_attachment=True,
-                    download_name='complaint_analysis_report.html',
-                    mimetype='text/html'
+                # Stream the report to the client as a file download
+                return Response(
+                    generate_report(result),
+                    mimetype='text/html',
+                    headers={'Content-Disposition': 'attachment; filename=complaint_analysis_report.html'}
                 )
         else:
             if request.is_json:
@@ -0,0 +1,105 @@
+"""
+Tests for the complaint data processing in app.py
+"""
+
+import base64
+import os
+from io import BytesIO
+
+import pandas as pd
+
+import app
+from app import encode_base64_chunks, process_complaint_data
+
+SAMPLE_COMPLAINTS = os.path.join(os.path.dirname(__file__), '..', 'sample_complaint_data.xlsx')
+
+def write_excel(path, rows):
+    """Write a list of row dicts to an Excel file and return its path as a string"""
+    pd.DataFrame(rows).to_excel(path, index=False)
+    return str(path)
+
+def complaint(row_id, subcategory, atoll, person_id=None, household_id=None, category='Services'):
+    """Build one complaint row with the required columns"""
+    return {
+        'category': category,
+        'subcategory': subcategory,
+        'person_id': person_id or f'p{row_id}',
+        'household_id': household_id or f'h{row_id}',
+        'row_id': row_id,
+        'island': f'{atoll} Island',
+        'atoll': atoll
+    }
+
+def test_location_without_subcategories_gets_empty_tables(tmp_path):
+    complaints = write_excel(tmp_path / 'complaints.xlsx', [
+        complaint(1, 'Water', 'X'),
+        complaint(2, 'Water', 'X'),
+        complaint(3, 'Roads', 'X'),
+        complaint(4, None, 'Z')
+    ])
+
+    result = process_complaint_data(complaints)
+
+    assert result['success'], result.get('error')
+    atoll_z = result['data']['by_atoll']['Z']
+    assert atoll_z['summary'] == {'total_complaints': 1, 'total_individuals': 1, 'total_households': 1}
+    for table in ('subcategory_table', 'individual_table', 'household_table'):
+        assert len(atoll_z[table]['subcategory']) == 0
+    assert list(result['data']['by_atoll']['X']['subcategory_table']['count']) == [2, 1]
+
+def test_partial_translation_falls_back_per_row_without_duplicating_rows(tmp_path):
+    complaints = write_excel(tmp_path / 'complaints.xlsx', [
+        complaint(1, 'Water', 'X'),
+        complaint(2, 'Water', 'X'),
+        complaint(3, 'Roads', 'X')
+    ])
+    translations = write_excel(tmp_path / 'translations.xlsx', [
+        {'category': 'Services', 'subcategory': 'Water', 'category_en': 'Services EN', 'subcategory_en': 'Water EN'},
+        {'category': 'Services', 'subcategory': 'Water', 'category_en': 'Services EN', 'subcategory_en': 'Water EN'}
+    ])
+
+    result = process_complaint_data(complaints, translations)
+
+    assert result['success'], result.get('error')
+    assert result['total_complaints'] == 3
+    table = result['data']['by_atoll']['X']['subcategory_table']
+    assert dict(zip(table['subcategory'], table['count'])) == {'Water EN': 2, 'Roads': 1}
+
+def test_encode_base64_chunks_matches_whole_string_encoding():
+    chunks = ['<p>', 'Malé', 'ab', '', 'c' * 7, '</p>']
+    expected = base64.b64encode(''.join(chunks).encode('utf-8')).decode('ascii')
+    assert encode_base64_chunks(chunks) == expected
+    assert encode_base64_chunks([]) == ''
+
+def test_result_cache_keys_on_content_and_extension(monkeypatch):
+    calls = []
+    monkeypatch.setattr(app, 'process_complaint_data', lambda source, filename=None: calls.append(filename) or {'success': True})
+    monkeypatch.setattr(app, 'result_cache', app.OrderedDict())
+
+    app.process_complaint_data_cached(b'workbook', 'complaints.xlsx')
+    app.process_complaint_data_cached(b'workbook', 'COPY.XLSX')
+    app.process_complaint_data_cached(b'workbook', 'complaints.xls')
+
+    assert calls == ['complaints.xlsx', 'complaints.xls']
+
+def test_upload_streams_report_and_reuses_cached_analysis(monkeypatch):
+    calls = []
+    process = app.process_complaint_data
+    monkeypatch.setattr(app, 'process_complaint_data', lambda *args, **kwargs: calls.append(1) or process(*args, **kwargs))
+    monkeypatch.setattr(app, 'result_cache', app.OrderedDict())
+    client = app.app.test_client()
+    with open(SAMPLE_COMPLAINTS, 'rb') as f:
+        data = f.read()
+
+    for _ in range(2):
+        response = client.post(
+            '/upload',
+            data={'file': (BytesIO(data), 'sample_complaint_data.xlsx')},
+            content_type='multipart/form-data'
+        )
+
+        assert response.status_code == 200
+        assert response.headers['Content-Disposition'] == 'attachment; filename=complaint_analysis_report.html'
+        assert response.get_data(as_text=True).rstrip().endswith('</body></html>')
+
+    assert len(calls) == 1